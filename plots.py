@@ -1,14 +1,78 @@
 import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
 import re
 import subprocess
 import json
+import logging
+import tempfile
+import threading
+import functools
+import atexit
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    # Optional: streams exiftool's JSON output instead of parsing it in one go
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
 
 # Define default fields at the module level (add this near the top of the file)
 DEFAULT_FIELDS = ['FileName', 'BandName', 'CentralWavelength', 'WavelengthFWHM']
 
+# Pattern to match YYYYMMDD visit directories
+DATE_PATTERN = re.compile(r'^\d{8}$')
+
+# Cloud-optimized GeoTIFFs are derived products, not raw captures, and are skipped
+COG_SUFFIX = '_cog.tif'
+
+# Common subdirectories where imagery might be stored, searched when a directory has no TIFs
+TIF_SUBDIRS = ('imagery', 'rgb', 'multispec', 'level0_raw')
+
+# Common paths for multispectral images relative to a plot visit directory, in search order
+MULTISPEC_SUBDIRS = (
+    ('imagery', 'multispec', 'level0_raw'),
+    ('imagery', 'multispec'),
+    ('multispec', 'level0_raw'),
+    ('multispec',),
+    (),
+)
+
+# Pattern to match multispectral band files (_1.tif through _N.tif), capturing the band number
+BAND_FILE_PATTERN = re.compile(r'_([1-9]\d*)\.tif$')
+
+# Default number of worker threads for per-directory exiftool calls
+DEFAULT_MAX_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+# Persistent cache of exiftool results; set USE_EXIF_CACHE = False to always re-read files
+EXIF_CACHE_PATH = Path.home() / '.cache' / 'micasense_band_update' / 'exif_cache.json'
+USE_EXIF_CACHE = True
+MAX_EXIF_CACHE_ENTRIES = 50000
+
+# Low-cardinality columns stored as pandas categoricals to save memory and speed up groupby
+CATEGORICAL_COLUMNS = ('plot_id', 'Software', 'SwVersion')
+
+# Band fields stored as float64 (rather than string) when writing results to Parquet
+NUMERIC_FIELDS = ('CentralWavelength', 'CenterWavelength', 'WavelengthFWHM', 'Bandwidth')
+
+# Number of plot visit records buffered before each Parquet write
+PARQUET_BATCH_SIZE = 100
+
+# Name of the sorted visit date index built by index_by_date, which filter_date slices on
+DATE_INDEX_NAME = 'visit_date_index'
+
+# Parquet file metadata key listing the RigCameraIndex values present in the results
+PARQUET_BANDS_KEY = 'micasense_observed_bands'
+
+# Command line length (in characters) above which file lists are passed to exiftool via an argfile
+ARGFILE_THRESHOLD = 100000
+
 def parse_directory_structure(base_path):
     """
     Parse directory structure PlotID/YYYYMMDD into a pandas DataFrame
@@ -20,37 +84,43 @@ def parse_directory_structure(base_path):
         pd.DataFrame: DataFrame with columns ['plot_id', 'visit_date', 'full_path']
     """
     
-    data = []
-    base_path = Path(base_path)
-    
-    # Pattern to match YYYYMMDD format
-    date_pattern = re.compile(r'^\d{8}$')
+    plot_ids = []
+    dates = []
+    paths = []
     
     # Walk through the directory structure
-    for plot_dir in base_path.iterdir():
-        if plot_dir.is_dir():
-            plot_id = plot_dir.name
+    with os.scandir(base_path) as plot_entries:
+        for plot_entry in plot_entries:
+            if not plot_entry.is_dir():
+                continue
+            plot_id = plot_entry.name
             
             # Look for date subdirectories
-            for date_dir in plot_dir.iterdir():
-                if date_dir.is_dir() and date_pattern.match(date_dir.name):
-                    try:
-                        # Parse the date as pandas datetime (not just date)
-                        date_str = date_dir.name
-                        visit_date = pd.to_datetime(date_str, format='%Y%m%d')
-                        
-                        data.append({
-                            'plot_id': plot_id,
-                            'visit_date': visit_date,
-                            # 'date_string': date_str,
-                            'full_path': str(date_dir),
-                            # 'relative_path': f"{plot_id}/{date_str}"
-                        })
-                        
-                    except ValueError:
-                        print(f"Warning: Could not parse date {date_dir.name} in {plot_id}")
-    
-    return pd.DataFrame(data)
+            with os.scandir(plot_entry.path) as date_entries:
+                for date_entry in date_entries:
+                    if date_entry.is_dir() and DATE_PATTERN.match(date_entry.name):
+                        plot_ids.append(plot_id)
+                        dates.append(date_entry.name)
+                        paths.append(date_entry.path)
+    
+    # Parse all dates at once as pandas datetimes (not just dates)
+    df = pd.DataFrame({
+        'plot_id': plot_ids,
+        'visit_date': pd.to_datetime(dates, format='%Y%m%d', errors='coerce', cache=True),
+        'full_path': paths,
+    })
+    
+    # Drop directories whose names are not valid dates (e.g. 20241399)
+    bad = df['visit_date'].isna()
+    for plot_id, full_path in zip(df.loc[bad, 'plot_id'], df.loc[bad, 'full_path']):
+        print(f"Warning: Could not parse date {os.path.basename(full_path)} in {plot_id}")
+    
+    df = df[~bad].reset_index(drop=True)
+    
+    # Plot IDs repeat across visits, so store them as categories
+    df['plot_id'] = df['plot_id'].astype('category')
+    
+    return df
 
 # Quick analysis function
 def info(df):
@@ -67,6 +137,7 @@ def info(df):
         if len(sw_versions) > 0:
             print("\n=== Software Version Info ===")
             version_counts = df['SwVersion'].value_counts()
+            version_counts = version_counts[version_counts > 0]
             for version, count in version_counts.items():
                 if pd.notna(version):
                     print(f"  {version}: {count} visits")
@@ -81,6 +152,8 @@ def info(df):
 
 # Main execution
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+    
     # Replace with your actual base directory path
     BASE_DIR = "."  # Current directory, change as needed
     
@@ -135,7 +208,35 @@ if __name__ == "__main__":
         # print(f"\nMonthly visit distribution:")
         # print(monthly_visits.head(10))
 
+def to_categorical(df, columns=CATEGORICAL_COLUMNS):
+    """Convert low-cardinality string columns (plot and firmware identifiers) to categorical dtype in place"""
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
 # Utility functions with short names
+@functools.lru_cache(maxsize=128)
+def _to_ts(value):
+    """Parse a date once and reuse it for repeated filter calls with the same argument"""
+    return pd.to_datetime(value)
+
+def index_by_date(df):
+    """Index visits by a sorted DatetimeIndex so filter_date can slice instead of scanning every row
+    
+    Call it again after changing visit_date, since filter_date then slices on the index.
+    
+    Args:
+        df (pd.DataFrame): DataFrame containing plot data with a 'visit_date' column
+        
+    Returns:
+        pd.DataFrame: Copy of df sorted by visit_date, indexed by visit date (the column is kept)
+    """
+    # Name the index so filter_date only slices indexes built here; it cannot be named
+    # 'visit_date' itself, which would make sort_values('visit_date') ambiguous
+    index = pd.DatetimeIndex(df['visit_date'].to_numpy(), name=DATE_INDEX_NAME)
+    return df.set_index(index).sort_index(kind='stable')
+
 def filter_date(df, start=None, end=None):
     """Filter plots by date range
     
@@ -151,19 +252,27 @@ def filter_date(df, start=None, end=None):
     if start is None and end is None:
         return df
     
-    mask = pd.Series(True, index=df.index)
-    if start is not None:
-        mask &= (df['visit_date'] >= pd.to_datetime(start))
-    if end is not None:
-        mask &= (df['visit_date'] <= pd.to_datetime(end))
+    start = _to_ts(start) if start is not None else None
+    end = _to_ts(end) if end is not None else None
     
-    return df.loc[mask]
+    # Slice directly when the DataFrame was indexed with index_by_date
+    if (df.index.name == DATE_INDEX_NAME and isinstance(df.index, pd.DatetimeIndex)
+            and df.index.is_monotonic_increasing):
+        return df.loc[start:end]
+    
+    if start is not None and end is not None:
+        return df.loc[(df['visit_date'] >= start) & (df['visit_date'] <= end)]
+    if start is not None:
+        return df.loc[df['visit_date'] >= start]
+    return df.loc[df['visit_date'] <= end]
 
 def filter_year(df, year):
     """Filter by specific year(s)"""
+    # Fall back to the visit date if the derived year column has not been added
+    years = df['year'] if 'year' in df.columns else df['visit_date'].dt.year
     if isinstance(year, (list, tuple)):
-        return df[df['year'].isin(year)]
-    return df[df['year'] == year]
+        return df[years.isin(year)]
+    return df[years == year]
 
 def filter_plot(df, plot_id):
     """Get all visits for specific plot(s)"""
@@ -186,6 +295,106 @@ def yearly(df):
     """Get yearly visit counts"""
     return df.groupby('year').size().reset_index(name='visits')
 
+# On-disk cache of exiftool results, keyed by file fingerprints (path, mtime, size)
+# so that re-running an extraction skips files that have not changed. It is stored as
+# JSON (the cached values are exiftool JSON anyway), loaded on first use and written
+# back at exit, keeping the most recently used MAX_EXIF_CACHE_ENTRIES entries.
+def _to_tuple(value):
+    """Recursively convert JSON lists back into the tuples used as cache keys"""
+    return tuple(_to_tuple(v) for v in value) if isinstance(value, list) else value
+
+def _load_exif_cache():
+    """Load the persistent exiftool cache, returning an empty dict if missing or unreadable"""
+    try:
+        with open(EXIF_CACHE_PATH, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        return {_to_tuple(key): value for key, value in entries}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        # A corrupt or foreign cache file must never break the import or the extraction
+        logger.warning("Ignoring unreadable exiftool cache %s: %s", EXIF_CACHE_PATH, e)
+        return {}
+
+def _get_exif_cache():
+    """Return the in-memory cache, loading it from disk on first use"""
+    global _exif_cache
+    if _exif_cache is None:
+        with _exif_cache_lock:
+            if _exif_cache is None:
+                _exif_cache = _load_exif_cache()
+    return _exif_cache
+
+def _save_exif_cache():
+    """Write the exiftool cache back to disk if new entries were added this session"""
+    global _exif_cache_dirty
+    if not _exif_cache_dirty or _exif_cache is None:
+        return
+    tmp_path = None
+    try:
+        EXIF_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with _exif_cache_lock:
+            entries = list(_exif_cache.items())[-MAX_EXIF_CACHE_ENTRIES:]
+        # Write through a per-process temporary file so concurrent sessions never interleave
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=EXIF_CACHE_PATH.parent,
+                                         prefix=EXIF_CACHE_PATH.stem, suffix='.tmp', delete=False) as f:
+            tmp_path = f.name
+            json.dump(entries, f)
+        os.replace(tmp_path, EXIF_CACHE_PATH)
+        tmp_path = None
+        _exif_cache_dirty = False
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Could not save exiftool cache to %s: %s", EXIF_CACHE_PATH, e)
+    finally:
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _cache_get(key):
+    """Look up a cached exiftool result (None on miss or when caching is disabled)"""
+    if not USE_EXIF_CACHE:
+        return None
+    cache = _get_exif_cache()
+    with _exif_cache_lock:
+        value = cache.pop(key, None)
+        if value is not None:
+            # Move to the end so the most recently used entries survive trimming
+            cache[key] = value
+    return value
+
+def _cache_set(key, value):
+    """Store an exiftool result (JSON-serializable) in the cache"""
+    global _exif_cache_dirty
+    if USE_EXIF_CACHE:
+        cache = _get_exif_cache()
+        with _exif_cache_lock:
+            cache.pop(key, None)
+            cache[key] = value
+            # Bound memory in long sessions; the oldest entries are dropped first
+            while len(cache) > MAX_EXIF_CACHE_ENTRIES:
+                del cache[next(iter(cache))]
+            _exif_cache_dirty = True
+
+def _file_fingerprint(path):
+    """Return (resolved path, mtime_ns, size) for a file, used to invalidate stale cache entries"""
+    stat = os.stat(path)
+    return (os.path.realpath(path), stat.st_mtime_ns, stat.st_size)
+
+def clear_exif_cache():
+    """Remove all cached exiftool results, both in memory and on disk"""
+    global _exif_cache, _exif_cache_dirty
+    with _exif_cache_lock:
+        _exif_cache = {}
+        _exif_cache_dirty = False
+    try:
+        EXIF_CACHE_PATH.unlink()
+    except FileNotFoundError:
+        pass
+
+_exif_cache = None
+_exif_cache_dirty = False
+_exif_cache_lock = threading.RLock()
+atexit.register(_save_exif_cache)
+
 def extract_metadata(df, directory_path=None, fields=['SwVersion']):
     """
     Extract metadata from TIF files for existing plot DataFrame
@@ -196,23 +405,20 @@ def extract_metadata(df, directory_path=None, fields=['SwVersion']):
         fields (list): List of metadata fields to extract from TIF files
         
     Returns:
-        pd.DataFrame: DataFrame with additional metadata columns
+        pd.DataFrame: New DataFrame with additional metadata columns (the input is not modified;
+            its columns are shared with the result rather than copied)
     """
     print(f"Extracting metadata fields {', '.join(fields)} from TIF files...")
     
-    # Create a copy to avoid modifying the original
-    result_df = df.copy()
-    
-    # Apply the extract_tif_metadata function to each directory
-    metadata_list = []
-    for idx, row in df.iterrows():
-        path = directory_path if directory_path else row['full_path']
-        metadata = extract_tif_metadata(path, fields=fields)
-        metadata_list.append(metadata)
+    # Extract metadata for all directories with a single exiftool call
+    directories = [directory_path if directory_path else full_path
+                   for full_path, in df[['full_path']].itertuples(index=False, name=None)]
+    metadata_list = extract_tif_metadata_batch(directories, fields=fields)
         
-    # Convert list of dicts to DataFrame and join with main DataFrame
-    metadata_df = pd.DataFrame(metadata_list)
-    result_df = pd.concat([result_df, metadata_df], axis=1)
+    # Convert list of dicts to DataFrame and join with main DataFrame, aligned on its index
+    metadata_df = pd.DataFrame(metadata_list, index=df.index)
+    result_df = pd.concat([df, metadata_df], axis=1)
+    result_df = to_categorical(result_df)
     
     # Report on metadata extraction
     for field in fields:
@@ -221,80 +427,288 @@ def extract_metadata(df, directory_path=None, fields=['SwVersion']):
     
     return result_df
 
-# Simple wrapper function for easy usage
-def extract_tif_metadata(directory_path, fields=['Software', 'SwVersion']):
+def _find_tifs(root, max_files=11, max_depth=2):
     """
-    Extract metadata from the first TIF file found in a directory or its subdirectories
+    Breadth-first search for non-COG TIF files, stopping as soon as enough are found
+    
+    Args:
+        root (str or Path): Directory to search
+        max_files (int): Stop after this many TIF files have been found
+        max_depth (int or None): Maximum subdirectory depth to descend (None for no limit)
+        
+    Returns:
+        list: Paths (str) of the TIF files found, shallowest first
+    """
+    found = []
+    queue = deque([(os.fspath(root), 0)])
+    while queue:
+        path, depth = queue.popleft()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    name = entry.name.lower()
+                    if entry.is_dir(follow_symlinks=False):
+                        if max_depth is None or depth < max_depth:
+                            queue.append((entry.path, depth + 1))
+                    # Dotfiles are skipped: macOS AppleDouble sidecars (._*.tif) are not images
+                    elif name.endswith('.tif') and not name.endswith(COG_SUFFIX) and not name.startswith('.'):
+                        found.append(entry.path)
+                        if len(found) >= max_files:
+                            return found
+        except OSError:
+            # Skip directories that disappear or cannot be read
+            continue
+    return found
+
+def find_first_tif(directory_path):
+    """
+    Find the first non-COG TIF file in a directory or its subdirectories
     
     Args:
         directory_path (str or Path): Directory to search for TIF files
-        fields (list): List of metadata fields to extract
         
     Returns:
-        dict: Dictionary containing the requested metadata fields
+        Path or None: Path to the first TIF found, or None if there are none
     """
     directory_path = Path(directory_path)
     
     # Search for TIF files (non-recursively first for speed)
     tif_files = list(directory_path.glob('*.tif'))
     # Filter out files ending with _cog.tif
-    tif_files = [f for f in tif_files if not f.name.endswith('_cog.tif')]
+    tif_files = [f for f in tif_files if not f.name.endswith(COG_SUFFIX)]
     
     # If no TIFs found directly, search one level down
     if not tif_files:
         # Common subdirectories where imagery might be stored
-        for subdir in ['imagery', 'rgb', 'multispec', 'level0_raw']:
+        for subdir in TIF_SUBDIRS:
             potential_path = directory_path / subdir
             if potential_path.exists():
                 subdir_files = list(potential_path.glob('*.tif'))
                 # Filter out files ending with _cog.tif
-                subdir_files = [f for f in subdir_files if not f.name.endswith('_cog.tif')]
+                subdir_files = [f for f in subdir_files if not f.name.endswith(COG_SUFFIX)]
                 tif_files.extend(subdir_files)
         
-        # If still not found, search one more level down but limit search
+        # If still not found, search deeper but stop at the first non-COG TIF
         if not tif_files:
-            # Limit recursive search to first 3 non-COG TIFs to avoid performance issues
-            all_tifs = list(directory_path.glob('**/*.tif'))
-            tif_files = [f for f in all_tifs if not f.name.endswith('_cog.tif')][:3]
-    
-    # If no TIFs found, return empty metadata
-    if not tif_files:
-        return {field: None for field in fields}
+            tif_files = [Path(f) for f in _find_tifs(directory_path, max_files=1, max_depth=None)]
     
     # Take just the first TIF for speed
-    first_tif = str(tif_files[0])
+    return tif_files[0] if tif_files else None
+
+def iter_exiftool(file_paths, timeout=30):
+    """
+    Run exiftool once over a list of files and yield the parsed JSON records as they arrive
+    
+    Records are parsed incrementally from the exiftool output stream when ijson is installed,
+    otherwise the whole output is read and parsed with json.loads.
+    
+    Args:
+        file_paths (list): List of file paths (str or Path) to read
+        timeout (int): Timeout in seconds for the exiftool process
+        
+    Yields:
+        dict: Metadata for each file that exiftool could read
+    """
+    file_paths = [str(f) for f in file_paths]
+    if not file_paths:
+        return
+    
+    if ijson is None:
+        yield from run_exiftool(file_paths, timeout=timeout)
+        return
+    
+    # Pass long file lists through an argfile on stdin to stay under ARG_MAX
+    cmd, argfile = _exiftool_command(file_paths)
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE if argfile else subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=stderr)
+        # Kill exiftool if it runs past the timeout; the stream then ends early
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        try:
+            if argfile:
+                proc.stdin.write(argfile.encode())
+                proc.stdin.close()
+            try:
+                yield from ijson.items(proc.stdout, 'item', use_float=True)
+            except ijson.IncompleteJSONError:
+                # exiftool prints nothing when none of the files could be read
+                pass
+            except ijson.JSONError as e:
+                raise json.JSONDecodeError(str(e), '', 0) from e
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+        
+        if returncode < 0:
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        if returncode != 0:
+            stderr.seek(0)
+            logger.warning("exiftool failed with return code %s: %s", returncode,
+                           stderr.read().decode(errors='replace').strip())
+
+def run_exiftool(file_paths, timeout=30):
+    """
+    Run exiftool once over a list of files and return the parsed JSON records
+    
+    Args:
+        file_paths (list): List of file paths (str or Path) to read
+        timeout (int): Timeout in seconds for the exiftool process
+        
+    Returns:
+        list: List of metadata dicts, one per file that exiftool could read
+    """
+    file_paths = [str(f) for f in file_paths]
+    if not file_paths:
+        return []
+    
+    # Pass long file lists through an argfile on stdin to stay under ARG_MAX
+    cmd, argfile = _exiftool_command(file_paths)
+    result = subprocess.run(cmd, input=argfile, capture_output=True, text=True, timeout=timeout)
+    
+    if not result.stdout.strip():
+        if result.returncode != 0:
+            logger.warning("exiftool failed with return code %s: %s", result.returncode, result.stderr.strip())
+        return []
+    
+    return json.loads(result.stdout)
+
+def _exiftool_command(file_paths):
+    """Build the exiftool command line, returning (cmd, argfile) where argfile is stdin text or None"""
+    cmd = ['exiftool', '-j', '-fast', '-q']
+    if sum(len(f) + 1 for f in file_paths) > ARGFILE_THRESHOLD:
+        return cmd + ['-@', '-'], '\n'.join(file_paths)
+    return cmd + file_paths, None
+
+@functools.lru_cache(maxsize=None)
+def check_exiftool():
+    """
+    Check whether exiftool is installed, logging a diagnosis (only once per session)
     
-    # Run exiftool on the first TIF
+    Returns:
+        bool: True if exiftool could be run
+    """
     try:
-        result = subprocess.run(['exiftool', '-j', first_tif], 
-                              capture_output=True, text=True, timeout=10)
+        version_check = subprocess.run(['exiftool', '-ver'], 
+                                     capture_output=True, text=True, timeout=5)
+        if version_check.returncode == 0:
+            logger.info("exiftool is installed, version: %s", version_check.stdout.strip())
+            return True
+        logger.error("exiftool version check failed")
+    except Exception as e:
+        logger.error("Error checking exiftool version: %s. exiftool might not be installed or not in the PATH", e)
+    return False
+
+def extract_tif_metadata_batch(directories, fields=['Software', 'SwVersion']):
+    """
+    Extract metadata from the first TIF file of each directory using a single exiftool call
+    
+    Args:
+        directories (list): List of directories (str or Path) to search for TIF files
+        fields (list): List of metadata fields to extract
         
-        if result.returncode == 0 and result.stdout.strip():
-            metadata = json.loads(result.stdout)[0]  # Get the first (and only) item
-            
-            # Extract requested fields
-            extracted_data = {}
-            for field in fields:
-                extracted_data[field] = metadata.get(field, None)
-            
-            # Add filename for reference
-            extracted_data['metadata_source'] = Path(first_tif).name
-            return extracted_data
-        else:
-            return {field: None for field in fields}
-            
-    except (subprocess.SubprocessError, json.JSONDecodeError, IndexError, FileNotFoundError) as e:
-        # Handle various potential errors gracefully
-        print(f"Warning: Could not extract metadata from {first_tif}: {e}")
-        return {field: None for field in fields}
+    Returns:
+        list: One metadata dict per directory, in the same order as `directories`
+    """
+    # Pass 1: resolve one representative TIF per directory and check the cache
+    first_tifs = [find_first_tif(d) for d in directories]
+    cache_keys = {}
+    metadata_by_tif = {}
+    for tif in first_tifs:
+        if tif is None or tif in cache_keys:
+            continue
+        try:
+            cache_keys[tif] = ('tif', _file_fingerprint(tif), tuple(fields))
+        except OSError:
+            cache_keys[tif] = None
+        cached = _cache_get(cache_keys[tif]) if cache_keys[tif] is not None else None
+        if cached is not None:
+            metadata_by_tif[tif] = cached
+    uncached_tifs = [tif for tif in cache_keys if tif not in metadata_by_tif]
+    
+    # Pass 2: read all uncached files with one exiftool invocation
+    if uncached_tifs:
+        tifs_by_source = {tif.resolve(): tif for tif in uncached_tifs}
+        try:
+            # Scale the timeout with the number of files being read
+            for metadata in iter_exiftool(uncached_tifs, timeout=10 + len(uncached_tifs)):
+                tif = tifs_by_source.get(Path(metadata.get('SourceFile', '')).resolve())
+                if tif is None:
+                    continue
+                # Extract requested fields
+                metadata_by_tif[tif] = {field: metadata.get(field, None) for field in fields}
+                if cache_keys[tif] is not None:
+                    _cache_set(cache_keys[tif], metadata_by_tif[tif])
+        except (subprocess.SubprocessError, json.JSONDecodeError, FileNotFoundError) as e:
+            # Handle various potential errors gracefully
+            print(f"Warning: Could not extract metadata from {len(uncached_tifs)} TIF files: {e}")
+    
+    # Map results back to directories in input order
+    results = []
+    for tif in first_tifs:
+        if tif not in metadata_by_tif:
+            results.append({field: None for field in fields})
+            continue
+        
+        extracted_data = dict(metadata_by_tif[tif])
+        
+        # Add filename for reference
+        extracted_data['metadata_source'] = tif.name
+        results.append(extracted_data)
+    
+    return results
+
+# Simple wrapper function for easy usage
+def extract_tif_metadata(directory_path, fields=['Software', 'SwVersion']):
+    """
+    Extract metadata from the first TIF file found in a directory or its subdirectories
+    
+    Args:
+        directory_path (str or Path): Directory to search for TIF files
+        fields (list): List of metadata fields to extract
+        
+    Returns:
+        dict: Dictionary containing the requested metadata fields
+    """
+    return extract_tif_metadata_batch([directory_path], fields=fields)[0]
 
-def parse_plots(base_path, include_metadata=False):
+def add_date_columns(df):
+    """
+    Add year, month, day_of_year and days_since_first columns computed from visit_date
+    
+    Works directly on the datetime64 buffer truncated to days, months and years,
+    instead of going through a separate .dt accessor for each column.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with a 'visit_date' column
+        
+    Returns:
+        pd.DataFrame: DataFrame with the derived columns added
+    """
+    days = df['visit_date'].to_numpy().astype('datetime64[D]')
+    years = days.astype('datetime64[Y]')
+    months = days.astype('datetime64[M]')
+    
+    return df.assign(
+        year=(years.astype(np.int64) + 1970).astype(np.int32),
+        month=(months.astype(np.int64) % 12 + 1).astype(np.int32),
+        day_of_year=((days - years.astype('datetime64[D]')).astype(np.int64) + 1).astype(np.int32),
+        days_since_first=(days - days.min()).astype(np.int64),
+    )
+
+def parse_plots(base_path, include_metadata=False, derived=True):
     """
     Simple wrapper function that returns a processed DataFrame ready for analysis
     
     Args:
         base_path (str): Path to directory containing PlotID folders
         include_metadata (bool): Whether to extract metadata from TIF files
+        derived (bool): Whether to add the derived year, month, day_of_year and
+            days_since_first columns (needed by info, monthly and yearly)
         
     Returns:
         pd.DataFrame: Processed DataFrame with all derived columns
@@ -308,23 +722,19 @@ def parse_plots(base_path, include_metadata=False):
         return pd.DataFrame()
     
     # Add derived columns
-    df['year'] = df['visit_date'].dt.year
-    df['month'] = df['visit_date'].dt.month
-    df['day_of_year'] = df['visit_date'].dt.dayofyear
-    df['days_since_first'] = (df['visit_date'] - df['visit_date'].min()).dt.days
+    if derived:
+        df = add_date_columns(df)
     
     # Extract metadata if requested
     if include_metadata:
         print("Extracting metadata from TIF files (this may take a while)...")
-        # Apply the extract_tif_metadata function to each directory
-        metadata_list = []
-        for idx, row in df.iterrows():
-            metadata = extract_tif_metadata(row['full_path'])
-            metadata_list.append(metadata)
+        # Extract metadata for all directories with a single exiftool call
+        metadata_list = extract_tif_metadata_batch(df['full_path'].tolist())
             
         # Convert list of dicts to DataFrame and join with main DataFrame
-        metadata_df = pd.DataFrame(metadata_list)
+        metadata_df = pd.DataFrame(metadata_list, index=df.index)
         df = pd.concat([df, metadata_df], axis=1)
+        df = to_categorical(df)
         
         # Report on metadata extraction
         metadata_found = df['SwVersion'].notna().sum()
@@ -356,21 +766,14 @@ def extract_multispec_bands(directory_path, fields=None, max_band_number=11):
     if fields is None:
         fields = DEFAULT_FIELDS
 
-    directory_path = Path(directory_path)
+    # Work with plain string paths; they go straight to os.scandir and exiftool
+    directory_path = os.fspath(directory_path)
     
-    # Define common paths for multispectral images
-    multispec_paths = [
-        directory_path / "imagery" / "multispec" / "level0_raw",
-        directory_path / "imagery" / "multispec",
-        directory_path / "multispec" / "level0_raw",
-        directory_path / "multispec",
-        directory_path
-    ]
-    
-    # Find the first valid path that exists
+    # Find the first of the common multispectral image paths that exists
     valid_path = None
-    for path in multispec_paths:
-        if path.exists():
+    for parts in MULTISPEC_SUBDIRS:
+        path = os.path.join(directory_path, *parts)
+        if os.path.isdir(path):
             valid_path = path
             break
     
@@ -379,112 +782,93 @@ def extract_multispec_bands(directory_path, fields=None, max_band_number=11):
         return {}
     
     # Add debug information
-    print(f"Searching for TIF files in: {valid_path}")
+    logger.debug("Searching for TIF files in: %s", valid_path)
     
     # Look specifically for files with _1.tif through _N.tif pattern
     band_files = []
     
-    # First, try to find files with the specific naming pattern
-    for i in range(1, max_band_number + 1):
-        # Look for any file ending with _N.tif
-        pattern_files = list(valid_path.glob(f"*_{i}.tif"))
-        if pattern_files:
-            band_files.extend(pattern_files)
+    # First, try to find files with the specific naming pattern in a single directory scan
+    with os.scandir(valid_path) as entries:
+        for entry in entries:
+            # Look for any file ending with _N.tif, skipping dotfiles: macOS writes AppleDouble
+            # sidecars (._IMG_0001_1.tif) on non-HFS drives, which are not images
+            match = BAND_FILE_PATTERN.search(entry.name)
+            if match and not entry.name.startswith('.'):
+                band_number = int(match.group(1))
+                if band_number <= max_band_number:
+                    band_files.append((band_number, entry.name, entry.path))
+    
+    # Keep files ordered by band number
+    band_files = [path for _, _, path in sorted(band_files)]
     
     # If no band files found with the pattern, search recursively for any TIFs
     if not band_files:
-        print("No files with _N.tif pattern found, looking for any TIF files...")
-        # Try a recursive search up to 2 levels deep
-        all_tifs = []
-        for root, dirs, files in os.walk(str(valid_path)):
-            depth = len(Path(root).relative_to(valid_path).parts)
-            if depth <= 2:  # Only search up to 2 levels deep
-                for file in files:
-                    if file.lower().endswith('.tif') and not file.lower().endswith('_cog.tif'):
-                        all_tifs.append(os.path.join(root, file))
-                        if len(all_tifs) >= 11:  # Limit to 11 files
-                            break
-            if len(all_tifs) >= 11:
-                break
-        
-        band_files = [Path(f) for f in all_tifs]
+        logger.debug("No files with _N.tif pattern found in %s, looking for any TIF files...", valid_path)
+        # Try a recursive search up to 2 levels deep, limited to 11 files
+        band_files = _find_tifs(valid_path, max_files=11, max_depth=2)
     
     # If still no files found, return empty result
     if not band_files:
-        print("No TIF files found")
+        logger.info("No TIF files found in %s", valid_path)
         return {}
     
-    print(f"Found {len(band_files)} TIF files")
+    logger.debug("Found %d TIF files in %s", len(band_files), valid_path)
     
-    # Try to extract metadata using exiftool
+    # Reuse cached results while none of the band files passed to exiftool have changed
+    # (files can be edited in place without touching the directory mtime)
     try:
-        # Convert paths to strings for subprocess
-        file_paths = [str(f) for f in band_files]
-        
-        # Try to run exiftool directly on one file first to check if exiftool is working
-        first_file = file_paths[0]
-        test_result = subprocess.run(['exiftool', '-j', first_file], 
-                                   capture_output=True, text=True, timeout=10)
-        
-        if test_result.returncode != 0:
-            print(f"Error: exiftool command failed with return code {test_result.returncode}")
-            print(f"Error message: {test_result.stderr}")
-            
-            # Try to check if exiftool is installed
-            try:
-                version_check = subprocess.run(['exiftool', '-ver'], 
-                                             capture_output=True, text=True, timeout=5)
-                if version_check.returncode == 0:
-                    print(f"exiftool is installed, version: {version_check.stdout.strip()}")
-                else:
-                    print("exiftool version check failed")
-            except Exception as e:
-                print(f"Error checking exiftool version: {e}")
-                print("exiftool might not be installed or not in the PATH")
-            
-            return {}
-        
-        # If the test worked, proceed with all files
-        result = subprocess.run(['exiftool', '-j'] + file_paths,
-                              capture_output=True, text=True, timeout=30)
-        
-        if result.returncode != 0 or not result.stdout.strip():
-            print(f"Error extracting metadata from files in {valid_path}: {result.stderr}")
-            return {}
-        
-        # Parse the JSON output
-        try:
-            metadata_list = json.loads(result.stdout)
-            print(f"Successfully extracted metadata for {len(metadata_list)} files")
-            
-            # Organize by RigCameraIndex (band number)
-            bands_metadata = {}
-            for metadata in metadata_list:
-                rig_index = metadata.get('RigCameraIndex')
-                if rig_index is not None:
-                    # Extract requested fields
-                    band_data = {
-                        'filename': Path(metadata.get('SourceFile', '')).name
-                    }
-                    for field in fields:
-                        band_data[field] = metadata.get(field)
-                    
-                    # Store by RigCameraIndex
-                    bands_metadata[rig_index] = band_data
-            
-            print(f"Found {len(bands_metadata)} bands with RigCameraIndex")
-            return bands_metadata
-            
-        except json.JSONDecodeError:
-            print(f"Error decoding JSON output: {result.stdout[:100]}...")
-            return {}
-        
+        cache_key = ('bands', os.path.realpath(valid_path),
+                     tuple(_file_fingerprint(f) for f in band_files), tuple(fields))
+    except OSError:
+        cache_key = None
+    cached = _cache_get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        logger.debug("Using cached metadata for %d bands in %s", len(cached), valid_path)
+        return dict(cached)
+    
+    # Try to extract metadata using exiftool, organizing records by RigCameraIndex (band number)
+    # as they are streamed back
+    bands_metadata = {}
+    files_read = 0
+    try:
+        for metadata in iter_exiftool(band_files, timeout=30):
+            files_read += 1
+            rig_index = metadata.get('RigCameraIndex')
+            if rig_index is not None:
+                # Extract requested fields
+                band_data = {
+                    'filename': os.path.basename(metadata.get('SourceFile', ''))
+                }
+                for field in fields:
+                    band_data[field] = metadata.get(field)
+                
+                # Store by RigCameraIndex
+                bands_metadata[rig_index] = band_data
+    except json.JSONDecodeError as e:
+        logger.error("Error decoding JSON output from exiftool for %s: %s", valid_path, e)
+        return {}
+    except FileNotFoundError:
+        check_exiftool()
+        return {}
     except Exception as e:
-        print(f"Error running exiftool: {e}")
+        logger.error("Error running exiftool on %s: %s", valid_path, e)
         return {}
+    
+    if not files_read:
+        logger.error("Error extracting metadata from files in %s", valid_path)
+        # Only diagnose the exiftool installation once a run has failed
+        check_exiftool()
+        return {}
+    
+    logger.debug("Extracted metadata for %d files in %s, found %d bands with RigCameraIndex",
+                 files_read, valid_path, len(bands_metadata))
+    if bands_metadata and cache_key is not None:
+        # Stored as (RigCameraIndex, band_data) pairs so JSON keeps the index type
+        _cache_set(cache_key, list(bands_metadata.items()))
+    return bands_metadata
 
 # New function to extract and organize multispectral band metadata across plots
-def extract_multispec_analysis(plot_df, fields=None, max_band_number=11):
+def extract_multispec_analysis(plot_df, fields=None, max_band_number=11, max_workers=None, out_path=None):
     """
     Extract and organize multispectral band metadata for all plots in the DataFrame
     
@@ -492,69 +876,256 @@ def extract_multispec_analysis(plot_df, fields=None, max_band_number=11):
         plot_df (pd.DataFrame): DataFrame with plot_id, visit_date, and full_path columns
         fields (list, optional): List of metadata fields to extract from TIF files
         max_band_number (int): Maximum band number to look for (default: 11)
+        max_workers (int, optional): Number of directories processed in parallel
+            (default: twice the CPU count, capped at 16)
+        out_path (str or Path, optional): Parquet file to stream records to as each plot visit
+            completes, instead of holding them all in memory (requires pyarrow). Visits already
+            present in an existing file are skipped, so interrupted runs can be resumed. Visits
+            without band data are not saved, so they are retried on the next run.
         
     Returns:
         pd.DataFrame: DataFrame with one row per plot visit and columns for each band's metadata
+            (read back from out_path when given)
     """
     # Use default fields if none provided
     if fields is None:
         fields = DEFAULT_FIELDS
         
-    print(f"Extracting multispectral band metadata for {len(plot_df)} plot visits...")
-    print(f"Fields to extract: {', '.join(fields)}")
-    print(f"Looking for bands 1 through {max_band_number}")
+    logger.info("Extracting multispectral band metadata for %d plot visits...", len(plot_df))
+    logger.info("Fields to extract: %s; looking for bands 1 through %d", ', '.join(fields), max_band_number)
+    
+    if max_workers is None:
+        max_workers = DEFAULT_MAX_WORKERS
+    
+    band_fields = [field for field in fields if field != 'RigCameraIndex']  # Already captured in the prefix
+    
+    if out_path is not None:
+        return _extract_multispec_to_parquet(plot_df, fields, band_fields, max_band_number, max_workers, out_path)
     
     # Create a list to store data for each plot
-    data = []
+    directories = plot_df['full_path'].tolist()
+    all_bands_metadata = [None] * len(directories)
+    # closing() stops the workers as soon as the loop exits, even on an exception
+    with closing(_iter_multispec_bands(directories, fields, max_band_number, max_workers)) as results:
+        for idx, bands_metadata in results:
+            all_bands_metadata[idx] = bands_metadata
     total_processed = 0
     
-    # Process each plot directory
-    for idx, row in plot_df.iterrows():
-        plot_id = row['plot_id']
-        visit_date = row['visit_date']
-        directory = row['full_path']
-        
-        # Update progress less frequently to reduce console output
-        if idx % 5 == 0 or idx == len(plot_df) - 1:
-            print(f"Processing {plot_id}/{visit_date.strftime('%Y%m%d')} ({idx+1}/{len(plot_df)})")
-        
-        # Extract band metadata from this plot directory
-        bands_metadata = extract_multispec_bands(directory, fields, max_band_number)
-        
-        # Create base record with plot info
-        record = {
-            'plot_id': plot_id,
-            'visit_date': visit_date,
-            'full_path': directory
-        }
-        
-        # For each rig camera index (band), add its metadata to the record with prefixed column names
+    # Preallocate one array per output column; band columns are known up front from the fields
+    # and band numbers (RigCameraIndex runs from 0 to max_band_number - 1)
+    n = len(directories)
+    cols = {
+        'plot_id': plot_df['plot_id'].to_numpy(),
+        'visit_date': plot_df['visit_date'].to_numpy(),
+        'full_path': plot_df['full_path'].to_numpy(),
+        'Software': [None] * n,
+        'SwVersion': [None] * n,
+    }
+    for i in range(max_band_number):
+        for field in band_fields:
+            cols[f"Band{i}_{field}"] = [None] * n
+    
+    # Fill in each plot directory in input order, tracking which RigCameraIndex values occur
+    observed_bands = set()
+    for idx, bands_metadata in enumerate(all_bands_metadata):
         if bands_metadata:
             total_processed += 1
-            # First get just general software info from any band
-            first_band = next(iter(bands_metadata.values()), {})
-            record['Software'] = first_band.get('Software')
-            record['SwVersion'] = first_band.get('SwVersion')
-            
-            # Add each band's metadata with the band index in the column name
-            for rig_index, band_data in bands_metadata.items():
-                prefix = f"Band{rig_index}_"
-                for field in fields:
-                    if field != 'RigCameraIndex':  # Already captured in the prefix
-                        record[f"{prefix}{field}"] = band_data.get(field)
-        
-        data.append(record)
-        
-        # Every 10 plots, report progress
-        if idx > 0 and idx % 10 == 0:
-            print(f"Progress: {idx}/{len(plot_df)} plots processed ({idx/len(plot_df)*100:.1f}%)")
+            observed_bands.update(str(rig_index) for rig_index in bands_metadata)
+            for col, value in _band_record(bands_metadata, band_fields).items():
+                if col not in cols:
+                    # Unexpected RigCameraIndex outside the preallocated range
+                    cols[col] = [None] * n
+                cols[col][idx] = value
+    
+    # Drop the columns of bands that no plot visit has (columns of bands that do occur are
+    # kept even if the field is empty, e.g. Bandwidth before the metadata is fixed)
+    for i in range(max_band_number):
+        if str(i) not in observed_bands:
+            for field in band_fields:
+                del cols[f"Band{i}_{field}"]
     
     # Convert to DataFrame
-    result_df = pd.DataFrame(data)
+    result_df = pd.DataFrame(cols)
+    result_df = to_categorical(result_df)
     
-    print(f"Successfully processed metadata for {total_processed} of {len(result_df)} plot visits")
+    logger.info("Successfully processed metadata for %d of %d plot visits", total_processed, len(result_df))
     return result_df
 
+def _iter_multispec_bands(directories, fields, max_band_number, max_workers):
+    """
+    Run extract_multispec_bands over directories in parallel, yielding (position, bands_metadata)
+    in completion order. The work is dominated by exiftool subprocesses and filesystem access,
+    so threads suffice.
+    """
+    # Manage the executor explicitly: on an error or Ctrl-C, cancel the queued directories
+    # instead of waiting for all of them to finish (the context manager's shutdown(wait=True))
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(extract_multispec_bands, directory, fields, max_band_number): idx
+            for idx, directory in enumerate(directories)
+        }
+        for completed, future in enumerate(as_completed(futures), start=1):
+            yield futures[future], future.result()
+            
+            # Update progress less frequently to reduce console output
+            if (completed % 10 == 0 or completed == len(directories)) and logger.isEnabledFor(logging.INFO):
+                logger.info("Progress: %d/%d plots processed (%.1f%%)",
+                            completed, len(directories), completed / len(directories) * 100)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def _band_record(bands_metadata, band_fields):
+    """Flatten one plot visit's band metadata into Software, SwVersion and Band{index}_{field} values"""
+    # First get just general software info from any band
+    first_band = next(iter(bands_metadata.values()), {})
+    record = {
+        'Software': first_band.get('Software'),
+        'SwVersion': first_band.get('SwVersion'),
+    }
+    
+    # Add each band's metadata with the band index in the column name
+    for rig_index, band_data in bands_metadata.items():
+        for field in band_fields:
+            record[f"Band{rig_index}_{field}"] = band_data.get(field)
+    
+    return record
+
+def _extract_multispec_to_parquet(plot_df, fields, band_fields, max_band_number, max_workers, out_path):
+    """
+    Streaming variant of extract_multispec_analysis that appends records to a Parquet file in
+    batches of PARQUET_BATCH_SIZE, keeping at most one batch in memory
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Writing results to Parquet requires pyarrow (pip install pyarrow)") from e
+    
+    # Fixed schema: numeric band fields as floats, everything else as strings
+    band_cols = [f"Band{i}_{field}" for i in range(max_band_number) for field in band_fields]
+    numeric_cols = {f"Band{i}_{field}" for i in range(max_band_number) for field in band_fields
+                    if field in NUMERIC_FIELDS}
+    data_cols = ['Software', 'SwVersion'] + band_cols
+    schema = pa.schema(
+        [('plot_id', pa.string()), ('visit_date', pa.timestamp('us')), ('full_path', pa.string()),
+         ('Software', pa.string()), ('SwVersion', pa.string())]
+        + [(col, pa.float64() if col in numeric_cols else pa.string()) for col in band_cols]
+    )
+    
+    # Skip plot visits already written by a previous (possibly interrupted) run
+    out_path = os.fspath(out_path)
+    resuming = os.path.exists(out_path)
+    done = set()
+    observed_bands = set()
+    if resuming:
+        with pq.ParquetFile(out_path) as existing:
+            if not existing.schema_arrow.equals(schema):
+                raise ValueError(f"{out_path} was written with different fields or max_band_number")
+            # Visits whose extraction failed (no band data, e.g. rows written by older versions)
+            # are not counted as done, so they are retried
+            existing_df = existing.read(columns=['full_path'] + data_cols).to_pandas()
+            done = set(existing_df.loc[existing_df[data_cols].notna().any(axis=1), 'full_path'])
+            observed_bands = _parquet_observed_bands(existing)
+            if observed_bands is None:
+                # Older files without the metadata: count bands with any non-null value as present
+                table = existing.read(columns=band_cols)
+                observed_bands = {col[len('Band'):].split('_', 1)[0] for col in band_cols
+                                  if table.column(col).null_count < table.num_rows}
+        logger.info("Resuming: %d plot visits already in %s", len(done), out_path)
+    
+    rows = [row for row in plot_df[['plot_id', 'visit_date', 'full_path']].itertuples(index=False, name=None)
+            if row[2] not in done]
+    
+    # Write to a temporary file, copying any existing records first. It replaces out_path once the
+    # copy is complete (even if extraction is then interrupted, so the new records are kept);
+    # if the copy itself fails, the temporary file is discarded and out_path is left untouched
+    tmp_path = out_path + '.tmp'
+    copied = False
+    written = 0
+    failed = 0
+    try:
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            if resuming:
+                with pq.ParquetFile(out_path) as existing:
+                    for batch in existing.iter_batches():
+                        writer.write_table(pa.Table.from_batches([batch], schema=schema))
+            copied = True
+            
+            batch = []
+            try:
+                results = _iter_multispec_bands([row[2] for row in rows], fields, max_band_number, max_workers)
+                with closing(results):
+                    for idx, bands_metadata in results:
+                        # Only persist visits with band data: an empty result may be a timeout,
+                        # a missing exiftool or an unreadable directory, and must be retried
+                        if not bands_metadata:
+                            failed += 1
+                            continue
+                        plot_id, visit_date, directory = rows[idx]
+                        record = {'plot_id': str(plot_id), 'visit_date': visit_date, 'full_path': directory}
+                        observed_bands.update(str(rig_index) for rig_index in bands_metadata)
+                        # Columns outside the schema (unexpected RigCameraIndex values) are ignored
+                        for col, value in _band_record(bands_metadata, band_fields).items():
+                            record[col] = _parquet_value(value, col in numeric_cols)
+                        batch.append(record)
+                        if len(batch) >= PARQUET_BATCH_SIZE:
+                            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                            written += len(batch)
+                            batch = []
+            finally:
+                if batch:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                    written += len(batch)
+                # Record which RigCameraIndex values occur, so empty fields of present bands
+                # can be told apart from absent bands when reading back
+                writer.add_key_value_metadata({PARQUET_BANDS_KEY: json.dumps(sorted(observed_bands))})
+    finally:
+        if os.path.exists(tmp_path):
+            if copied:
+                os.replace(tmp_path, out_path)
+            else:
+                os.remove(tmp_path)
+    
+    logger.info("Wrote %d new plot visits to %s (%d without band data, not saved)", written, out_path, failed)
+    
+    # Read back, keeping the latest record with band data for each visit and dropping the
+    # columns of bands that no plot visit has
+    result_df = pd.read_parquet(out_path)
+    result_df = result_df[result_df[data_cols].notna().any(axis=1)]
+    result_df = result_df.drop_duplicates('full_path', keep='last')
+    
+    # Return the visits of plot_df in its order (completion order in the file, which may also
+    # hold visits from other runs), as the in-memory path does
+    visits = plot_df[['plot_id', 'visit_date', 'full_path']].reset_index(drop=True)
+    result_df = visits.merge(result_df.drop(columns=['plot_id', 'visit_date']), on='full_path', how='left')
+    with pq.ParquetFile(out_path) as written_file:
+        observed_bands = _parquet_observed_bands(written_file)
+    absent_cols = [f"Band{i}_{field}" for i in range(max_band_number) for field in band_fields
+                   if observed_bands is not None and str(i) not in observed_bands]
+    result_df = result_df.drop(columns=absent_cols)
+    return to_categorical(result_df)
+
+def _parquet_observed_bands(parquet_file):
+    """RigCameraIndex values recorded in a results file's metadata (None if not recorded)"""
+    metadata = parquet_file.metadata.metadata or {}
+    value = metadata.get(PARQUET_BANDS_KEY.encode())
+    return set(json.loads(value)) if value is not None else None
+
+def _parquet_value(value, numeric):
+    """Convert an exiftool value for a float64 (numeric) or string Parquet column"""
+    if value is None:
+        return None
+    if numeric:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, list):
+        # exiftool's own formatting for list-type tags
+        return ', '.join(str(v) for v in value)
+    return str(value)
+
 # New function to compare band assignments across firmware versions
 def compare_band_assignments(df):
     """
@@ -570,53 +1141,58 @@ def compare_band_assignments(df):
         print("Error: Software column not found in DataFrame")
         return pd.DataFrame()
     
-    # Get all unique firmware versions
-    versions = df['Software'].dropna().unique()
-    
     # Find all band columns
     band_cols = [col for col in df.columns if col.startswith('Band') and col.endswith('_BandName')]
     
-    # Create a summary DataFrame
-    summary_data = []
+    if not band_cols:
+        return pd.DataFrame()
     
-    # For each version, summarize band assignments
-    for version in versions:
-        version_df = df[df['Software'] == version]
-        
-        for band_col in band_cols:
-            # Extract band index from column name (e.g., 'Band0_BandName' -> '0')
-            band_idx = band_col.split('_')[0].replace('Band', '')
-            
-            # Count occurrences of each band name
-            value_counts = version_df[band_col].value_counts()
-            
-            # For each band name used for this RigCameraIndex
-            for band_name, count in value_counts.items():
-                if pd.notna(band_name):
-                    wavelength_col = f"Band{band_idx}_CentralWavelength"
-                    fwhm_col = f"Band{band_idx}_WavelengthFWHM"
-                    
-                    # Get the most common wavelength for this band assignment
-                    wavelength = version_df[version_df[band_col] == band_name][wavelength_col].mode().iloc[0] if not version_df[version_df[band_col] == band_name][wavelength_col].empty else None
-                    
-                    # Get the most common FWHM for this band assignment
-                    fwhm = version_df[version_df[band_col] == band_name][fwhm_col].mode().iloc[0] if not version_df[version_df[band_col] == band_name][fwhm_col].empty else None
-                    
-                    summary_data.append({
-                        'Software': version,
-                        'RigCameraIndex': band_idx,
-                        'BandName': band_name,
-                        'Count': count,
-                        'CentralWavelength': wavelength,
-                        'WavelengthFWHM': fwhm
-                    })
-    
-    # Convert to DataFrame and sort
-    summary_df = pd.DataFrame(summary_data)
-    if not summary_df.empty:
-        summary_df = summary_df.sort_values(['Software', 'RigCameraIndex']).reset_index(drop=True)
-    
-    return summary_df
+    # Extract band indexes from column names (e.g., 'Band0_BandName' -> '0')
+    band_idxs = [band_col.split('_')[0].replace('Band', '') for band_col in band_cols]
+    
+    # Stack the per-band columns into one long frame (one row per plot visit and band)
+    # with flat numpy concatenation rather than one DataFrame per band
+    long_df = pd.DataFrame({
+        'Software': np.tile(df['Software'].to_numpy(dtype=object), len(band_idxs)),
+        'RigCameraIndex': np.repeat(band_idxs, len(df)),
+        'BandName': _stack_band_columns(df, band_idxs, 'BandName'),
+        'CentralWavelength': _stack_band_columns(df, band_idxs, 'CentralWavelength'),
+        'WavelengthFWHM': _stack_band_columns(df, band_idxs, 'WavelengthFWHM'),
+    }).infer_objects()
+    long_df = long_df.dropna(subset=['Software', 'BandName'])
+    if long_df.empty:
+        return pd.DataFrame()
+    
+    # Count occurrences of each band name per firmware version and RigCameraIndex
+    keys = ['Software', 'RigCameraIndex', 'BandName']
+    summary_df = long_df.groupby(keys, sort=False, observed=True).size().rename('Count').to_frame()
+    
+    # Get the most common wavelength and FWHM for each band assignment
+    for col in ['CentralWavelength', 'WavelengthFWHM']:
+        summary_df[col] = _most_common_per_group(long_df, keys, col)
+    
+    # Sort by version and index, most frequent band assignment first
+    summary_df = summary_df.reset_index().sort_values(
+        ['Software', 'RigCameraIndex', 'Count'], ascending=[True, True, False], kind='stable'
+    )
+    
+    return summary_df.reset_index(drop=True)
+
+def _stack_band_columns(df, band_idxs, field):
+    """Concatenate the Band{i}_{field} columns into one flat object array (None where a column is missing)"""
+    return np.concatenate([
+        df[col].to_numpy(dtype=object) if col in df.columns else np.full(len(df), None, dtype=object)
+        for col in (f"Band{band_idx}_{field}" for band_idx in band_idxs)
+    ])
+
+def _most_common_per_group(df, keys, col):
+    """
+    Most common non-null value of `col` within each group of `keys`, ties broken by the smallest value
+    (the same value `Series.mode().iloc[0]` returns)
+    """
+    counts = df.groupby(keys + [col], observed=True).size().rename('n').reset_index()
+    counts = counts.sort_values(['n', col], ascending=[False, True], kind='stable')
+    return counts.drop_duplicates(keys).set_index(keys)[col]
 
 # Function to create a more compact band assignment table
 def create_band_table(df):
@@ -635,25 +1211,14 @@ def create_band_table(df):
     if summary_df.empty:
         return pd.DataFrame()
     
-    # Create a pivot table: Versions as rows, RigCameraIndex as columns
-    pivot_df = summary_df.pivot_table(
-        index='Software', 
-        columns='RigCameraIndex', 
-        values='BandName',
-        aggfunc=lambda x: x.iloc[0] if len(x) > 0 else None
-    )
-    
-    # Add wavelength information
-    wavelength_df = summary_df.pivot_table(
-        index='Software', 
-        columns='RigCameraIndex', 
-        values='CentralWavelength',
-        aggfunc=lambda x: x.iloc[0] if len(x) > 0 else None
-    )
+    # Take the most frequent assignment for each version and RigCameraIndex (the summary is
+    # sorted by count within each group), then label it with its wavelength
+    first_df = summary_df.drop_duplicates(['Software', 'RigCameraIndex'])
+    labels = first_df['BandName'].astype(str) + " (" + first_df['CentralWavelength'].astype(str) + " nm)"
     
-    # Rename columns to add wavelength info
-    for col in wavelength_df.columns:
-        if col in pivot_df.columns:
-            pivot_df[col] = pivot_df[col].astype(str) + " (" + wavelength_df[col].astype(str) + " nm)"
+    # Create a pivot table: Versions as rows, RigCameraIndex as columns
+    pivot_df = labels.set_axis(
+        pd.MultiIndex.from_arrays([first_df['Software'].astype(str), first_df['RigCameraIndex']])
+    ).unstack('RigCameraIndex')
     
     return pivot_df